@@ -0,0 +1,283 @@
+"""Benchmarks for CoverageChecker and the HTTP endpoints on the real towers.kmz.
+
+    python bench.py                      # everything
+    python bench.py parse latency        # a subset
+    python bench.py http --concurrency 32 --requests 5000 --out results.json
+
+Every benchmark prints one JSON object per line (and --out collects them
+into a JSON list). Synthetic points are drawn from a seeded generator, so
+runs are comparable across commits.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Benchmarks build their own checkers; keep main from loading in the background
+os.environ.setdefault("COVERAGE_AUTOLOAD", "0")
+
+import numpy as np
+import shapely
+
+import main as coverage
+from main import KMZ_FILE, CoverageChecker
+
+SEED = 1234
+# Bounding box around the towers.kmz Areas (Gauteng)
+LAT_RANGE = (-26.35, -25.85)
+LON_RANGE = (27.75, 28.45)
+# Far from any Area: Northern Cape
+FAR_LAT_RANGE = (-30.5, -28.5)
+FAR_LON_RANGE = (19.0, 22.0)
+
+
+def synthetic_points(n, seed=SEED, lat_range=LAT_RANGE, lon_range=LON_RANGE):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(*lat_range, n), rng.uniform(*lon_range, n)
+
+
+def percentiles_us(samples):
+    samples = np.asarray(samples) * 1e6
+    return {
+        "mean_us": round(float(samples.mean()), 2),
+        "p50_us": round(float(np.percentile(samples, 50)), 2),
+        "p90_us": round(float(np.percentile(samples, 90)), 2),
+        "p99_us": round(float(np.percentile(samples, 99)), 2),
+    }
+
+
+# ==========================================
+# PARSE (fresh process per run)
+# ==========================================
+def _parse_worker(kmz_path, workers, queue):
+    # workers > 1 forces the per-Area process pool regardless of file size
+    coverage.PARSE_WORKERS = workers
+    coverage.PARALLEL_PARSE_MIN_BYTES = 0 if workers > 1 else coverage.PARALLEL_PARSE_MIN_BYTES
+    tracemalloc.start()
+    started = time.perf_counter()
+    gdf = coverage.load_kmz(kmz_path)
+    elapsed = time.perf_counter() - started
+    _, py_peak = tracemalloc.get_traced_memory()
+    try:
+        import resource
+        max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:   # Windows
+        max_rss_kb = None
+    queue.put({"seconds": elapsed, "features": len(gdf), "py_peak_mb": py_peak / 1e6, "max_rss_kb": max_rss_kb})
+
+
+def bench_parse(args, checker=None):
+    """load_kmz wall time and peak memory, each run in a clean process.
+
+    One row for the serial stream and one for the per-Area process pool
+    with --parse-workers (peak memory is the parent's only).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for mode, workers in (("serial", 1), ("parallel", args.parse_workers)):
+        runs = []
+        for _ in range(args.repeats):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_parse_worker, args=(args.kmz, workers, queue))
+            proc.start()
+            runs.append(queue.get())
+            proc.join()
+        results.append({
+            "benchmark": "parse",
+            "mode": mode,
+            "workers": workers,
+            "features": runs[0]["features"],
+            "seconds_min": round(min(r["seconds"] for r in runs), 4),
+            "seconds_median": round(float(np.median([r["seconds"] for r in runs])), 4),
+            "py_peak_mb": round(max(r["py_peak_mb"] for r in runs), 2),
+            "max_rss_mb": round(max(r["max_rss_kb"] for r in runs) / 1024, 1) if runs[0]["max_rss_kb"] else None,
+        })
+    return results
+
+
+# ==========================================
+# CHECK_POINT LATENCY (by outcome)
+# ==========================================
+def bench_latency(args, checker):
+    """check_point latency for polygon hits, tower-proximity hits and far-away points."""
+    lats, lons = synthetic_points(args.points * 20)
+    groups = {"polygon": [], "tower": []}
+    for lat, lon in zip(lats, lons):
+        is_covered, details = checker.check_point(lat, lon)
+        kind = None
+        if is_covered:
+            kind = "polygon" if details["match_type"] == "Inside Polygon Coverage" else "tower"
+        if kind and len(groups[kind]) < args.points:
+            groups[kind].append((lat, lon))
+    far_lats, far_lons = synthetic_points(args.points, lat_range=FAR_LAT_RANGE, lon_range=FAR_LON_RANGE)
+    groups["far_outside"] = list(zip(far_lats, far_lons))
+
+    results = []
+    for kind, points in groups.items():
+        timings = []
+        for lat, lon in points:
+            started = time.perf_counter()
+            checker.check_point(lat, lon)
+            timings.append(time.perf_counter() - started)
+        results.append({"benchmark": "latency", "case": kind, "samples": len(points), **percentiles_us(timings)})
+    return results
+
+
+# ==========================================
+# PREPARED VS RAW POLYGONS
+# ==========================================
+def bench_prepared(args, checker):
+    """Exact point-in-polygon tests on STRtree candidates, raw vs prepared."""
+    lats, lons = synthetic_points(200_000)
+    point_idx, poly_idx = checker.polygon_tree.query(shapely.points(lons, lats))
+    xs, ys = lons[point_idx], lats[point_idx]
+
+    def best_time(geoms):
+        shapely.contains_xy(geoms, xs, ys)   # warm-up
+        timings = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            shapely.contains_xy(geoms, xs, ys)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    raw = shapely.from_wkb(shapely.to_wkb(checker.polygon_geoms))   # Unprepared copies
+    raw_s = best_time(raw[poly_idx])
+    prepared_s = best_time(checker.polygon_geoms[poly_idx])
+    return {
+        "benchmark": "prepared",
+        "pairs": len(point_idx),
+        "unprepared_ns_per_test": round(raw_s / len(point_idx) * 1e9, 1),
+        "prepared_ns_per_test": round(prepared_s / len(point_idx) * 1e9, 1),
+        "speedup": round(raw_s / prepared_s, 2),
+    }
+
+
+# ==========================================
+# HTTP THROUGHPUT (real uvicorn process)
+# ==========================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _drive(base_url, requests, concurrency):
+    import aiohttp
+
+    async with aiohttp.ClientSession(base_url) as session:
+        queue = asyncio.Queue()
+        for req in requests:
+            queue.put_nowait(req)
+        latencies, errors = [], 0
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                method, path, kwargs = queue.get_nowait()
+                started = time.perf_counter()
+                async with session.request(method, path, **kwargs) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return time.perf_counter() - started, latencies, errors
+
+
+def bench_http(args, checker=None):
+    """End-to-end /check and /check-get throughput against a uvicorn subprocess."""
+    port = free_port()
+    env = dict(os.environ, COVERAGE_AUTOLOAD="1", KMZ_WATCH_INTERVAL_S="0", RESULT_CACHE_SIZE="0",
+               GEOCODE_CACHE_FILE=":memory:")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        import urllib.request
+        deadline = time.time() + 120
+        while True:
+            try:
+                with urllib.request.urlopen(f"{base_url}/health") as resp:
+                    if json.load(resp)["kmz_loaded"]:
+                        break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError("server did not become ready")
+            time.sleep(0.2)
+
+        lats, lons = synthetic_points(args.requests, seed=SEED + 1)
+        cases = {
+            "/check-get": [("GET", "/check-get", {"params": {"lat": str(a), "lon": str(o)}}) for a, o in zip(lats, lons)],
+            "/check": [("POST", "/check", {"json": {"latitude": a, "longitude": o}}) for a, o in zip(lats, lons)],
+        }
+        results = []
+        for path, requests in cases.items():
+            elapsed, latencies, errors = asyncio.run(_drive(base_url, requests, args.concurrency))
+            results.append({
+                "benchmark": "http", "path": path, "requests": len(requests), "concurrency": args.concurrency,
+                "errors": errors, "requests_per_s": round(len(requests) / elapsed, 1), **percentiles_us(latencies),
+            })
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "latency": bench_latency,
+    "prepared": bench_prepared,
+    "http": bench_http,
+}
+NEEDS_CHECKER = {"latency", "prepared"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", metavar="name", help=f"any of {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--kmz", default=KMZ_FILE)
+    parser.add_argument("--points", type=int, default=2000, help="samples per latency case")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per HTTP endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--parse-workers", type=int, default=max(2, os.cpu_count() or 1),
+                        help="process pool size for the parallel parse row")
+    parser.add_argument("--out", help="also write all results to this JSON file")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    names = args.names or list(BENCHMARKS)
+
+    checker = CoverageChecker(args.kmz) if NEEDS_CHECKER & set(names) else None
+    env = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+           "shapely": shapely.__version__, "numpy": np.__version__, "seed": SEED}
+    collected = []
+    for name in names:
+        result = BENCHMARKS[name](args, checker)
+        for row in result if isinstance(result, list) else [result]:
+            row = {**row, "env": env}
+            collected.append(row)
+            print(json.dumps(row), flush=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(collected, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
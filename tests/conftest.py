@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# main.py reads its configuration at import time
+os.environ["COVERAGE_AUTOLOAD"] = "0"
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+KMZ = str(ROOT / main.KMZ_FILE)
+
+
+def write_kmz(path, kml):
+    """A KMZ holding one doc.kml, for small hand-written datasets."""
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr("doc.kml", kml)
+    return str(path)
+
+
+def normalize(result):
+    """JSON round trip, so numpy scalars and floats compare like API responses."""
+    return json.loads(json.dumps(result, default=str))
+
+
+@pytest.fixture(scope="session")
+def snapshot_path(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("snapshot") / "towers.kmz.snapshot.npz")
+
+
+@pytest.fixture(scope="session")
+def eager(snapshot_path):
+    """Parsed from the KMZ; also writes the snapshot the other checkers load."""
+    checker = main.CoverageChecker(KMZ, snapshot_path=snapshot_path)
+    assert os.path.exists(snapshot_path)
+    return checker
+
+
+@pytest.fixture(scope="session")
+def from_snapshot(eager, snapshot_path):
+    return main.CoverageChecker(KMZ, snapshot_path=snapshot_path)
+
+
+@pytest.fixture(scope="session")
+def mapped(eager, snapshot_path, tmp_path_factory):
+    return main.MappedCoverageChecker.open_or_build(str(tmp_path_factory.mktemp("index")), KMZ, snapshot_path)
+
+
+@pytest.fixture(scope="session")
+def lazy(eager, snapshot_path):
+    # A small cache, so the points also exercise Area eviction
+    return main.LazyCoverageChecker(KMZ, snapshot_path, max_areas=4)
+
+
+@pytest.fixture(scope="session")
+def points(eager):
+    """Seeded points over the dataset, plus points just off each tower."""
+    rng = np.random.default_rng(7)
+    (minx, miny), (maxx, maxy) = eager.tower_lonlat.min(axis=0), eager.tower_lonlat.max(axis=0)
+    lats = rng.uniform(miny - 0.05, maxy + 0.05, 1500)
+    lons = rng.uniform(minx - 0.05, maxx + 0.05, 1500)
+    towers = eager.tower_lonlat[rng.choice(len(eager.tower_lonlat), 200, replace=False)]
+    lats = np.concatenate([lats, towers[:, 1] + rng.normal(0, 0.003, len(towers))])
+    lons = np.concatenate([lons, towers[:, 0] + rng.normal(0, 0.003, len(towers))])
+    return lats, lons
+
+
+@pytest.fixture(scope="session")
+def expected(eager, points):
+    """Eager check_point results for the seeded points, the reference for every other path."""
+    lats, lons = points
+    results = normalize([eager.check_point(lat, lon) for lat, lon in zip(lats, lons)])
+    # Only a useful reference if it holds misses and both kinds of hit
+    covered = [ok for ok, _ in results]
+    assert any(covered) and not all(covered)
+    assert {details['match_type'] for ok, details in results if ok} == {"Inside Polygon Coverage", "Tower Proximity"}
+    return results
+
+
+@pytest.fixture
+def client(eager):
+    # No lifespan: the loaded checker is installed directly, as load_services would
+    main.checker = eager
+    main.services_loaded.set()
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="session")
+def covered_point(eager):
+    """A tower location: inside its rings or its radius."""
+    lon, lat = eager.tower_lonlat[0]
+    return float(lat), float(lon)
+
+
+def assert_same_checker(checker, eager, points, expected):
+    """checker serves the same dataset and the same check_point answers as eager."""
+    assert checker.version == eager.version
+    assert len(checker.polygon_payloads) == len(eager.polygon_payloads)
+    assert len(checker.tower_payloads) == len(eager.tower_payloads)
+    lats, lons = points
+    assert normalize([checker.check_point(lat, lon) for lat, lon in zip(lats, lons)]) == expected
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import main
+from conftest import write_kmz
+
+
+def placemark(name, lon, lat):
+    return f"<Placemark><name>{name}</name><Point><coordinates>{lon},{lat}</coordinates></Point></Placemark>"
+
+
+def ring(name, tier, lon, lat, d=0.01):
+    coords = f"{lon - d},{lat - d} {lon + d},{lat - d} {lon + d},{lat + d} {lon - d},{lat + d} {lon - d},{lat - d}"
+    return (f"<Placemark><name>{name}</name><styleUrl>#{tier}</styleUrl><Polygon><outerBoundaryIs><LinearRing>"
+            f"<coordinates>{coords}</coordinates></LinearRing></outerBoundaryIs></Polygon></Placemark>")
+
+
+# One Area in Johannesburg, loose towers in Cape Town and Durban
+KML = f"""<kml xmlns="http://www.opengis.net/kml/2.2"><Document>
+<Folder><name>Area 01</name><Folder><name>Site A</name>
+{placemark("Site A - Tower", 28.05, -26.10)}{ring("Good", "good", 28.05, -26.10)}
+</Folder></Folder>
+{placemark("Loose CPT", 18.42, -33.92)}
+{placemark("Loose DBN", 31.03, -29.86)}
+</Document></kml>"""
+
+
+@pytest.fixture(params=["eager", "lazy", "mapped"])
+def checker(request, tmp_path):
+    kmz = write_kmz(tmp_path / "towers.kmz", KML)
+    snapshot = str(tmp_path / "towers.kmz.snapshot.npz")
+    if request.param == "eager":
+        return main.CoverageChecker(kmz, snapshot_path=snapshot)
+    if request.param == "lazy":
+        return main.LazyCoverageChecker(kmz, snapshot)
+    return main.MappedCoverageChecker.open_or_build(str(tmp_path / "index"), kmz, snapshot)
+
+
+def test_loose_features_get_their_own_boxes(checker):
+    assert len(checker.area_bounds) == 3
+    # The Karoo lies between the loose towers, but in no box
+    assert not checker.outside_areas(-26.10, 28.05)
+    assert checker.outside_areas(-31.50, 24.00)
+    assert checker.check_point(-31.50, 24.00) == (False, None)
+    assert checker.coverage_tier(-31.50, 24.00) is None
+
+
+def test_loose_towers_still_match(checker):
+    ok, details = checker.check_point(-33.93, 18.42)
+    assert ok and details['name'] == "Loose CPT" and details['area'] == ""
+    assert checker.coverage_tiers([-29.87, -26.10], [31.03, 28.05]) == [main.TOWER_RADIUS_TIER, "good"]
+
+
+def test_batch_early_reject(checker):
+    lats, lons = np.array([-26.10, -31.50, -33.93]), np.array([28.05, 24.00, 18.42])
+    assert list(checker.in_area_bounds(lats, lons)) == [0, 2]
+    assert checker.check_points(lats, lons)[0] == [True, False, True]
+
+
+def test_area_codes():
+    assert list(main.area_codes(["Area 01", "", "Area 02", "Area 01", ""])) == [0, 1, 2, 0, 3]
@@ -0,0 +1,35 @@
+import pytest
+
+from conftest import normalize
+
+
+@pytest.mark.parametrize("name", ["eager", "from_snapshot", "mapped", "lazy"])
+def test_batch_agrees_with_single_checks(request, name, points, expected):
+    checker = request.getfixturevalue(name)
+    lats, lons = points
+    covered, details = checker.check_points(lats, lons)
+    assert normalize(list(zip(covered, details))) == expected
+
+
+def test_batch(client, covered_point):
+    lat, lon = covered_point
+    resp = client.post("/check-batch", json={"latitudes": [lat, 0.0], "longitudes": [lon, 0.0]})
+    assert resp.status_code == 200
+    assert [r["in_coverage"] for r in resp.json()["results"]] == [True, False]
+
+
+def test_empty_batch(client, eager):
+    resp = client.post("/check-batch", json={"latitudes": [], "longitudes": []})
+    assert resp.status_code == 200
+    assert resp.json() == {"dataset_version": eager.version, "results": []}
+
+
+def test_batch_rejects_mismatched_lengths(client):
+    resp = client.post("/check-batch", json={"latitudes": [-26.0], "longitudes": []})
+    assert resp.status_code == 400
+
+
+def test_batch_rejects_invalid_coords(client):
+    # Bare NaN is not valid JSON; out-of-range values take the same check
+    resp = client.post("/check-batch", json={"latitudes": [-26.0, 95.0], "longitudes": [28.0, 28.0]})
+    assert resp.status_code == 400
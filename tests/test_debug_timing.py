@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    cache = main.ResultCache()
+    monkeypatch.setattr(main, "result_cache", cache)
+    return cache
+
+
+def get_check(client, point, **params):
+    lat, lon = point
+    response = client.get("/check-get", params={"lat": lat, "lon": lon, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_no_timing_by_default(client, covered_point, result_cache):
+    body = get_check(client, covered_point)
+    assert body["timing"] is None
+    assert result_cache.misses == 1
+
+
+@pytest.fixture
+def tower_point(points, expected):
+    """A point covered by tower proximity only, so check_point runs every stage."""
+    lats, lons = points
+    i = next(i for i, (ok, details) in enumerate(expected) if ok and details['match_type'] == "Tower Proximity")
+    return float(lats[i]), float(lons[i])
+
+
+def test_debug_timing_breakdown(client, tower_point, result_cache):
+    plain = get_check(client, tower_point)
+    body = get_check(client, tower_point, debug="true")
+    timing = body["timing"]
+    assert (body["in_coverage"], body["details"]) == (plain["in_coverage"], plain["details"])
+    assert list(timing["stages_ms"]) == ["wait_for_checker", "area_filter", "polygon_check", "tower_check"]
+    assert all(ms >= 0 for ms in timing["stages_ms"].values())
+    assert timing["total_ms"] == pytest.approx(sum(timing["stages_ms"].values()), abs=1e-3)
+    assert set(timing["candidates"]) == {"polygons", "towers_in_radius"}
+    assert timing["candidates"]["towers_in_radius"] >= 1
+    assert timing["result_cache"] == "bypassed"
+    # Debug requests measure a real lookup: the cache is neither read nor filled
+    assert (result_cache.hits, result_cache.misses) == (0, 1)
+
+
+def test_debug_stops_at_the_deciding_stage(client, covered_point):
+    polygon_hit = get_check(client, covered_point, debug="true")["timing"]["stages_ms"]
+    assert list(polygon_hit) == ["wait_for_checker", "area_filter", "polygon_check"]
+    rejected = get_check(client, (0.0, 0.0), debug="true")["timing"]["stages_ms"]
+    assert list(rejected) == ["wait_for_checker", "area_filter"]
+
+
+def test_debug_header(client, covered_point):
+    assert get_check(client, covered_point)["timing"] is None
+    lat, lon = covered_point
+    for value, traced in (("1", True), ("true", True), ("0", False), ("", False)):
+        response = client.get("/check-get", params={"lat": lat, "lon": lon}, headers={"X-Debug-Timing": value})
+        assert (response.json()["timing"] is not None) == traced, value
+
+
+def test_debug_boolean_check(client, covered_point):
+    timing = get_check(client, covered_point, details="false", debug="true")["timing"]
+    assert "tier_check" in timing["stages_ms"]
+    assert "polygon_check" not in timing["stages_ms"]
+
+
+def test_post_check_timing(client, covered_point):
+    lat, lon = covered_point
+    response = client.post("/check?debug=true", json={"latitude": str(lat), "longitude": str(lon)})
+    assert response.status_code == 200
+    assert list(response.json()["timing"]["stages_ms"])[:2] == ["unwrap", "wait_for_checker"]
+
+
+def test_address_timing_notes_geocode_cache(client, covered_point, monkeypatch, tmp_path):
+    lat, lon = covered_point
+    cache = main.GeocodeCache(str(tmp_path / "geocode.sqlite3"))
+    cache.put("1 Main Rd", main.CachedLocation("1 Main Rd, Sandton", lat, lon))
+    monkeypatch.setattr(main, "geocode_cache", cache)
+    monkeypatch.setattr(main, "geolocator", SimpleNamespace())   # Never called on a cache hit
+    response = client.post("/check", json={"address": "1 Main Rd"}, headers={"X-Debug-Timing": "1"})
+    assert response.status_code == 200
+    timing = response.json()["timing"]
+    assert timing["geocode_cache"] == "hit"
+    assert "geocode_cache" in timing["stages_ms"] and "geocode" not in timing["stages_ms"]
+    assert response.json()["in_coverage"]
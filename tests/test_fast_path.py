@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import main
+from conftest import KMZ
+
+
+def fast_tier(ok, details):
+    """The tier the boolean path reports for a check_point result."""
+    if not ok:
+        return None
+    return details['tier'] if details['match_type'] == "Inside Polygon Coverage" else main.TOWER_RADIUS_TIER
+
+
+@pytest.mark.parametrize("name", ["eager", "from_snapshot", "mapped", "lazy"])
+def test_fast_path_agrees_with_detailed_path(request, name, points, expected):
+    checker = request.getfixturevalue(name)
+    lats, lons = points
+    tiers = checker.coverage_tiers(lats, lons)
+    assert tiers == [fast_tier(ok, details) for ok, details in expected]
+    assert [checker.check_point_fast(lat, lon)[0] for lat, lon in zip(lats[:300], lons[:300])] == \
+        [t is not None for t in tiers[:300]]
+
+
+@pytest.fixture
+def fresh(eager, snapshot_path):
+    """A checker whose tier unions have not been built yet."""
+    checker = main.CoverageChecker(KMZ, snapshot_path=snapshot_path)
+    assert checker.tier_unions is None
+    return checker
+
+
+def test_unions_cover_every_tier(fresh):
+    unions = fresh.dissolved_tiers()
+    assert list(unions) == [t for t in main.COVERAGE_TIERS if t in set(fresh.polygons['tier'])]
+    assert fresh.dissolved_tiers() is unions
+
+
+def test_reload_builds_unions_in_the_background(fresh, snapshot_path, monkeypatch):
+    monkeypatch.setattr(main, "KMZ_FILE", KMZ)
+    monkeypatch.setattr(main, "SNAPSHOT_FILE", snapshot_path)
+    monkeypatch.setattr(main, "checker", fresh)
+    main.reload_checker()
+    deadline = time.monotonic() + 30
+    while main.checker.tier_unions is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert main.checker.tier_unions is not None
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_first_boolean_request_builds_unions_off_the_loop(client, fresh, covered_point, monkeypatch, debug):
+    main.checker = fresh
+    builds = []
+    build = fresh.dissolved_tiers
+
+    def recording_build():
+        if fresh.tier_unions is None:
+            on_loop = asyncio.events._get_running_loop() is not None
+            builds.append((threading.current_thread().name, on_loop))
+        return build()
+
+    monkeypatch.setattr(fresh, "dissolved_tiers", recording_build)
+    lat, lon = covered_point
+    resp = client.get("/check-get", params={"lat": lat, "lon": lon, "details": "false", "debug": debug})
+    assert resp.status_code == 200
+    assert len(builds) == 1 and builds[0][1] is False
+    assert fresh.tier_unions is not None
+
+
+def test_details_flag(client, eager, covered_point):
+    lat, lon = covered_point
+    full = client.get("/check-get", params={"lat": lat, "lon": lon}).json()
+    fast = client.get("/check-get", params={"lat": lat, "lon": lon, "details": "false"}).json()
+    assert full["in_coverage"] is fast["in_coverage"] is True
+    assert fast["details"] == {"tier": fast_tier(True, full["details"])}
+    assert "match_type" in full["details"]
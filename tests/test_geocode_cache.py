@@ -0,0 +1,110 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+LOCATION = main.CachedLocation("1 Main Rd, Sandton", -26.1, 28.05)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable time.time() as seen by main."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(main, "time", SimpleNamespace(
+        time=lambda: now.value, perf_counter=time.perf_counter, sleep=time.sleep
+    ))
+    return now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "geocode.sqlite3")
+
+
+def test_normalize():
+    assert main.GeocodeCache.normalize("  1 Main Rd ,Sandton ") == "1 main rd, sandton"
+    assert main.GeocodeCache.normalize("1 MAIN  RD, SANDTON") == "1 main rd, sandton"
+
+
+def test_hit_after_put_under_another_spelling(db_path):
+    cache = main.GeocodeCache(db_path)
+    assert cache.get("1 Main Rd, Sandton") == (False, None)
+    cache.put("1 Main Rd, Sandton", LOCATION)
+    assert cache.get("1 main rd ,  SANDTON") == (True, LOCATION)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_found_addresses_expire_after_ttl(db_path, clock):
+    cache = main.GeocodeCache(db_path)
+    cache.put("1 Main Rd", LOCATION)
+    clock.value += main.GEOCODE_CACHE_TTL_S - 1
+    assert cache.get("1 Main Rd") == (True, LOCATION)
+    clock.value += 2
+    assert cache.get("1 Main Rd") == (False, None)
+
+
+def test_not_found_expires_sooner(db_path, clock):
+    assert main.GEOCODE_NEGATIVE_TTL_S < main.GEOCODE_CACHE_TTL_S
+    cache = main.GeocodeCache(db_path)
+    cache.put("Nowhere 404", None)
+    clock.value += main.GEOCODE_NEGATIVE_TTL_S - 1
+    assert cache.get("Nowhere 404") == (True, None)
+    clock.value += 2
+    assert cache.get("Nowhere 404") == (False, None)
+
+
+def test_entries_survive_a_restart(db_path):
+    cache = main.GeocodeCache(db_path)
+    cache.put("1 Main Rd", LOCATION)
+    cache.put("Nowhere 404", None)
+    cache.db.close()
+
+    restarted = main.GeocodeCache(db_path)
+    assert restarted.stats()["entries"] == 0
+    assert restarted.get("1 MAIN RD") == (True, LOCATION)
+    assert restarted.get("nowhere 404") == (True, None)
+    assert restarted.stats()["persistent"] is True
+
+
+def test_expired_rows_are_purged_on_start(db_path, clock):
+    cache = main.GeocodeCache(db_path)
+    cache.put("Nowhere 404", None)
+    cache.db.close()
+    clock.value += main.GEOCODE_NEGATIVE_TTL_S + 1
+    restarted = main.GeocodeCache(db_path)
+    assert restarted.db.execute("SELECT COUNT(*) FROM geocode_cache").fetchone() == (0,)
+
+
+def test_unwritable_path_is_memory_only(tmp_path):
+    cache = main.GeocodeCache(str(tmp_path / "missing" / "geocode.sqlite3"))
+    assert cache.stats()["persistent"] is False
+    cache.put("1 Main Rd", LOCATION)
+    assert cache.get("1 Main Rd") == (True, LOCATION)
+
+
+def test_lru_bound(db_path):
+    cache = main.GeocodeCache(db_path, max_size=2)
+    for address in ("a", "b", "c"):
+        cache.put(address, LOCATION)
+    assert list(cache.memory) == ["b", "c"]
+    assert cache.get("a") == (True, LOCATION)   # Still on disk
+
+
+def test_check_address_geocodes_once(client, covered_point, db_path, monkeypatch):
+    lat, lon = covered_point
+    calls = []
+
+    class Geolocator:
+        async def geocode(self, address, timeout=None):
+            calls.append(address)
+            return main.CachedLocation("Tower Site", lat, lon)
+
+    monkeypatch.setattr(main, "geolocator", Geolocator())
+    monkeypatch.setattr(main, "geocode_cache", main.GeocodeCache(db_path))
+    for address in ("Tower Site", "tower  site"):
+        resp = client.post("/check", json={"address": address})
+        assert resp.status_code == 200
+        assert resp.json()["in_coverage"] is True
+    assert calls == ["Tower Site"]
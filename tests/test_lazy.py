@@ -0,0 +1,52 @@
+import main
+from conftest import KMZ, assert_same_checker, normalize
+
+
+def test_lazy_checker_agrees(lazy, eager, points, expected):
+    assert_same_checker(lazy, eager, points, expected)
+
+
+def test_batch_and_tier_paths_agree(lazy, eager, points):
+    lats, lons = points[0][:300], points[1][:300]
+    assert normalize(lazy.check_points(lats, lons)) == normalize(eager.check_points(lats, lons))
+    assert lazy.coverage_tiers(lats, lons) == eager.coverage_tiers(lats, lons)
+
+
+def test_nothing_built_until_queried(eager, snapshot_path):
+    checker = main.LazyCoverageChecker(KMZ, snapshot_path)
+    assert checker.stats() == {
+        "areas": len(checker.area_bounds), "resident": 0, "max_areas": main.LAZY_AREA_CACHE_SIZE, "loads": 0, "evictions": 0
+    }
+    assert checker.check_point(0.0, 0.0) == (False, None)   # Outside every Area
+    assert checker.stats()["loads"] == 0
+
+
+def test_evicts_least_recently_used_area(eager, snapshot_path):
+    checker = main.LazyCoverageChecker(KMZ, snapshot_path, max_areas=2)
+    a, b, c = checker.polygon_areas[:3]
+    first = checker.area_block(a)
+    checker.area_block(b)
+    assert checker.area_block(a) is first   # Reused, and now most recent
+    checker.area_block(c)
+    assert list(checker.blocks) == [a, c]
+    assert (checker.stats()["loads"], checker.stats()["evictions"]) == (3, 1)
+
+
+def test_small_cache_gives_the_same_answers(eager, snapshot_path, points, expected):
+    checker = main.LazyCoverageChecker(KMZ, snapshot_path, max_areas=1)
+    assert_same_checker(checker, eager, points, expected)
+    stats = checker.stats()
+    assert stats["resident"] == 1
+    assert stats["evictions"] == stats["loads"] - 1 > 0
+
+
+def test_unwritable_snapshot_still_loads(eager, tmp_path, points, expected):
+    # Parsed once; the index comes from the parsed frame when the snapshot cannot be saved
+    checker = main.LazyCoverageChecker(KMZ, str(tmp_path / "missing-dir" / "towers.kmz.snapshot.npz"))
+    assert_same_checker(checker, eager, points, expected)
+
+
+def test_health_reports_lazy_areas(client, lazy, monkeypatch):
+    assert client.get("/health").json()["lazy_areas"] is None   # Eager checker
+    monkeypatch.setattr(main, "checker", lazy)
+    assert client.get("/health").json()["lazy_areas"] == lazy.stats()
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+import main
+from conftest import KMZ, assert_same_checker, normalize, write_kmz
+
+
+def test_mapped_checker_agrees(mapped, eager, points, expected):
+    assert_same_checker(mapped, eager, points, expected)
+
+
+def test_mapped_payloads_agree(mapped, eager):
+    for kind in ('polygon_payloads', 'tower_payloads'):
+        ours, theirs = getattr(mapped, kind), getattr(eager, kind)
+        assert ours.columns == theirs.columns
+        for idx in (0, len(theirs) // 2, len(theirs) - 1):
+            assert normalize(ours.get(idx)) == normalize(theirs.get(idx))
+
+
+def test_attributes_stay_mapped(mapped):
+    # No per-worker copies: columns are packed UTF-8 over the mapped files
+    assert not hasattr(mapped, 'polygons') and not hasattr(mapped, 'points')
+    for payloads in (mapped.polygon_payloads, mapped.tower_payloads):
+        for column in payloads.values:
+            assert isinstance(column, main.PackedStrings)
+            assert isinstance(column.data, np.memmap) and isinstance(column.offsets, np.memmap)
+
+
+def test_packed_strings():
+    values = ["Good (50–600 m)", "", "Café"]
+    column = main.PackedStrings(*main.PackedStrings.pack(values))
+    assert len(column) == 3
+    assert list(column) == values
+    assert column[2] == "Café"
+
+
+def test_long_values_do_not_pad_every_row(tmp_path):
+    placemarks = "".join(
+        f"<Placemark><name>T{i}</name><description>{'x' * (20_000 if i == 0 else 10)}</description>"
+        f"<Point><coordinates>28.{i:02d},-26.1</coordinates></Point></Placemark>"
+        for i in range(50)
+    )
+    kmz = write_kmz(tmp_path / "towers.kmz", f'<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+                                             f'<Folder><name>Area 01</name>{placemarks}</Folder></Document></kml>')
+    checker = main.MappedCoverageChecker.open_or_build(str(tmp_path / "index"), kmz)
+    (index_path,) = [e.path for e in os.scandir(tmp_path / "index") if e.is_dir()]
+    # About the text itself, where a fixed-width str column would take 50 * 20000 * 4 bytes
+    assert os.path.getsize(os.path.join(index_path, "point_description.npy")) < 25_000
+    assert len(checker.tower_payloads.get(0)['description']) == 20_000
+    assert checker.tower_payloads.get(1)['description'] == 'x' * 10
+
+
+def test_index_is_reused(mapped, tmp_path, monkeypatch):
+    index_dir = str(tmp_path / "index")
+    main.MappedCoverageChecker.open_or_build(index_dir, KMZ)
+
+    def no_build(self, index_path):
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr(main.CoverageChecker, "write_mapped_index", no_build)
+    assert main.MappedCoverageChecker.open_or_build(index_dir, KMZ).version == mapped.version
+    (name,) = [n for n in os.listdir(index_dir) if not n.startswith(".")]
+    assert name.endswith(f".v{main.MAPPED_INDEX_VERSION}.{main.SNAPSHOT_VERSION}")
+
+
+def test_prune_keeps_the_previous_version(tmp_path):
+    for age, name in enumerate(["current", "previous", "older", "oldest", "x.123.tmp"]):
+        path = tmp_path / name
+        path.mkdir()
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+    main.MappedCoverageChecker.prune_versions(str(tmp_path), keep=str(tmp_path / "current"))
+    assert sorted(os.listdir(tmp_path)) == ["current", "previous"]
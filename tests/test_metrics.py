@@ -0,0 +1,57 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+import main
+from conftest import KMZ
+
+
+def scrape(client):
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == main.CONTENT_TYPE_LATEST
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(resp.text) for sample in family.samples
+    }
+
+
+def value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_metrics_count_requests_stages_and_matches(client, eager):
+    lon, lat = eager.tower_lonlat[1]
+    before = scrape(client)
+    # Points no other test asks for, so the result cache cannot answer them
+    assert client.get("/check-get", params={"lat": float(lat) + 1e-4, "lon": float(lon)}).status_code == 200
+    assert client.get("/check-get", params={"lat": 1.2345, "lon": 2.3456}).status_code == 200
+    after = scrape(client)
+
+    def delta(name, **labels):
+        return value(after, name, **labels) - value(before, name, **labels)
+
+    assert delta("coverage_request_seconds_count", path="/check-get") == 2
+    assert delta("coverage_stage_seconds_count", stage="polygon_check") == 1   # The far point is rejected before it
+    assert delta("coverage_matches_total", match_type="none") == 1
+    assert delta("coverage_matches_total", match_type="Inside Polygon Coverage") + \
+        delta("coverage_matches_total", match_type="Tower Proximity") == 1
+    assert delta("result_cache_misses_total") == 2
+
+
+def test_untimed_paths_are_not_recorded(client):
+    before = scrape(client)
+    client.get("/health")
+    after = scrape(client)
+    assert value(after, "coverage_request_seconds_count", path="/health") == 0
+    assert value(after, "coverage_request_seconds_count", path="/metrics") == \
+        value(before, "coverage_request_seconds_count", path="/metrics")
+
+
+def test_dataset_gauges_follow_reloads(client, eager, snapshot_path, monkeypatch):
+    monkeypatch.setattr(main, "KMZ_FILE", KMZ)
+    monkeypatch.setattr(main, "SNAPSHOT_FILE", snapshot_path)
+    monkeypatch.setattr(main, "checker", eager)
+    main.reload_checker()
+    samples = scrape(client)
+    assert value(samples, "coverage_dataset_features", kind="polygons") == len(eager.polygons)
+    assert value(samples, "coverage_dataset_features", kind="towers") == len(eager.points)
+    assert value(samples, "coverage_kmz_load_seconds") > 0
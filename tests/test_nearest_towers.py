@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import main
+from conftest import normalize
+
+
+def brute_force_km(eager, lat, lon):
+    """Great-circle km from (lat, lon) to every tower, in tower order."""
+    lon2, lat2 = np.radians(eager.tower_lonlat[:, 0]), np.radians(eager.tower_lonlat[:, 1])
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * main.EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(params=["mapped", "lazy"])
+def other(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_closest_first_and_matches_brute_force(eager, points):
+    lats, lons = points
+    for lat, lon in zip(lats[:50], lons[:50]):
+        towers = eager.nearest_towers(lat, lon, 5)
+        distances = [t['distance_km'] for t in towers]
+        assert len(towers) == 5 and distances == sorted(distances)
+        expected = np.sort(brute_force_km(eager, lat, lon))[:5]
+        assert distances == pytest.approx(expected, abs=0.01)
+
+
+def test_max_km_caps_the_distance(eager, covered_point):
+    lat, lon = covered_point
+    everything = eager.nearest_towers(lat, lon, main.MAX_NEAREST_TOWERS)
+    cutoff = everything[10]['distance_km']
+    capped = eager.nearest_towers(lat, lon, main.MAX_NEAREST_TOWERS, max_km=cutoff - 0.01)
+    assert capped == everything[:len(capped)]
+    assert all(t['distance_km'] < cutoff for t in capped) and len(capped) <= 10
+    assert eager.nearest_towers(0.0, 0.0, 5, max_km=1.0) == []
+
+
+def test_nearest_towers_agree(eager, other, points):
+    lats, lons = points
+    for lat, lon in zip(lats[:50], lons[:50]):
+        assert normalize(other.nearest_towers(lat, lon, 5, 25.0)) == normalize(eager.nearest_towers(lat, lon, 5, 25.0))
+
+
+def test_endpoint(client, eager, covered_point):
+    lat, lon = covered_point
+    resp = client.get("/nearest-towers", params={"lat": lat, "lon": lon, "k": 3})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["dataset_version"] == eager.version
+    assert body["towers"] == normalize(eager.nearest_towers(lat, lon, 3))
+    assert body["towers"][0]['distance_km'] == 0.0
+    assert all('match_type' not in t for t in body["towers"])
+
+
+@pytest.mark.parametrize("params", [
+    {"max_km": "nan"}, {"max_km": 0}, {"max_km": -1}, {"k": 0}, {"k": main.MAX_NEAREST_TOWERS + 1},
+    {"lat": "nan"}, {"lon": "inf"}, {"lat": 91},
+])
+def test_endpoint_rejects_bad_input(client, covered_point, params):
+    lat, lon = covered_point
+    assert client.get("/nearest-towers", params={"lat": lat, "lon": lon, **params}).status_code == 400
@@ -0,0 +1,63 @@
+import zipfile
+
+import pytest
+import shapely
+
+import main
+from conftest import KMZ
+
+
+def parse(kmz_path, parse_kml, progress):
+    with zipfile.ZipFile(kmz_path) as z:
+        with z.open(next(f for f in z.namelist() if f.endswith('.kml'))) as f:
+            return parse_kml(f, progress)
+
+
+def as_rows(features):
+    return [{**f, 'geometry': shapely.to_wkb(f['geometry'])} for f in features]
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    monkeypatch.setattr(main, "PARSE_WORKERS", 2)
+    monkeypatch.setattr(main, "PARALLEL_PARSE_MIN_BYTES", 0)
+
+
+def test_parallel_matches_stream(two_workers):
+    stream_progress = {"placemarks_parsed": 0}
+    parallel_progress = {"placemarks_parsed": 0}
+    stream = parse(KMZ, main.parse_kml_stream, stream_progress)
+    parallel = parse(KMZ, main.parse_kml_parallel, parallel_progress)
+    assert len(parallel) == len(stream) > 0
+    assert as_rows(parallel) == as_rows(stream)
+    assert parallel_progress == stream_progress
+
+
+def test_load_kmz_takes_parallel_path(two_workers, monkeypatch, eager):
+    calls = []
+    parse_kml_parallel = main.parse_kml_parallel
+
+    def counted(f, progress=None):
+        calls.append(progress)
+        return parse_kml_parallel(f, progress)
+
+    monkeypatch.setattr(main, "parse_kml_parallel", counted)
+    progress = {"placemarks_parsed": 0}
+    gdf = main.load_kmz(KMZ, progress)
+    assert calls == [progress]
+    assert len(gdf) == len(eager.gdf)
+
+
+def test_parse_placemark_needs_no_checker():
+    placemark = main.etree.fromstring(
+        b'<Folder xmlns="http://www.opengis.net/kml/2.2"><name>Area 07</name><Folder><name>Site A</name>'
+        b'<Placemark><name>Site A - Tower</name><styleUrl>#tower</styleUrl>'
+        b'<Point><coordinates>28.0,-26.0,0</coordinates></Point></Placemark></Folder></Folder>'
+    ).find('.//{*}Placemark')
+    feature = main.parse_placemark(placemark)
+    assert (feature['area'], feature['site'], feature['tier']) == ("Area 07", "Site A", "tower")
+    assert feature['geometry'].coords[0] == (28.0, -26.0)
+
+
+def test_unreadable_chunk_is_skipped():
+    assert main.parse_kml_chunk(b"") == ([], 0)
@@ -0,0 +1,38 @@
+import pandas as pd
+
+import main
+
+
+def test_from_frame_copies_plain_lists():
+    frame = pd.DataFrame({'name': ["a", "b"], 'tier': ["good", "fair"], 'geometry': [None, None]})
+    payloads = main.FeaturePayloads.from_frame(frame)
+    assert payloads.columns == ('name', 'tier')
+    assert all(type(v) is list for v in payloads.values)
+    assert len(payloads) == 2
+    assert payloads.column('tier') == ["good", "fair"]
+    assert payloads.get(1) == {'name': "b", 'tier': "fair"}
+
+
+def test_get_returns_a_fresh_dict():
+    payloads = main.FeaturePayloads({'name': ["a"]})
+    payloads.get(0)['match_type'] = "x"
+    assert payloads.get(0) == {'name': "a"}
+
+
+def test_empty_payloads():
+    assert len(main.FeaturePayloads({})) == 0
+
+
+def test_payloads_match_the_frames(eager):
+    for frame, payloads in ((eager.polygons, eager.polygon_payloads), (eager.points, eager.tower_payloads)):
+        assert len(payloads) == len(frame)
+        for idx in (0, len(frame) // 2, len(frame) - 1):
+            assert payloads.get(idx) == frame.drop(columns='geometry').iloc[idx].to_dict()
+
+
+def test_polygon_details(eager):
+    idx = int(eager.polygon_tower.argmax())   # A polygon linked to its tower
+    details = eager.polygon_details(idx)
+    assert details['match_type'] == "Inside Polygon Coverage"
+    assert details['name'] == eager.polygons['name'].iloc[idx]
+    assert details['tower']['name'] == eager.points['name'].iloc[eager.polygon_tower[idx]]
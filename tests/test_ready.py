@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import anyio.to_thread
+import httpx
+import pytest
+
+import main
+from conftest import KMZ
+
+
+@pytest.fixture
+def loading(monkeypatch, tmp_path, snapshot_path):
+    """The app as it is before load_services has finished; globals are restored afterwards."""
+    monkeypatch.setattr(main, "services_loaded", threading.Event())
+    monkeypatch.setattr(main, "services_ready", None)
+    monkeypatch.setattr(main, "event_loop", None)
+    monkeypatch.setattr(main, "checker", None)
+    monkeypatch.setattr(main, "checker_loaded", False)
+    monkeypatch.setattr(main, "geolocator", None)
+    monkeypatch.setattr(main, "geocode_cache", None)
+    monkeypatch.setattr(main, "READY_TIMEOUT_S", 0.2)
+    monkeypatch.setattr(main, "KMZ_FILE", KMZ)
+    monkeypatch.setattr(main, "SNAPSHOT_FILE", snapshot_path)
+    monkeypatch.setattr(main, "GEOCODE_CACHE_FILE", str(tmp_path / "geocode.sqlite3"))
+    monkeypatch.setattr(main, "KMZ_WATCH_INTERVAL_S", 0)
+
+
+def run_app(scenario):
+    """Run scenario(client) on one event loop, inside the app's lifespan."""
+    async def main_task():
+        async with main.lifespan(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+    return asyncio.run(main_task())
+
+
+def test_health_ready(loading, eager):
+    from fastapi.testclient import TestClient
+    client = TestClient(main.app)
+    resp = client.get("/health/ready")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "loading"
+    main.checker = eager
+    main.services_loaded.set()
+    assert client.get("/health/ready").json() == {"status": "ready", "dataset_version": eager.version}
+
+
+def test_requests_time_out_while_loading(loading):
+    async def scenario(client):
+        started = time.perf_counter()
+        resp = await client.get("/check-get", params={"lat": -26.1, "lon": 28.05})
+        return resp, time.perf_counter() - started
+
+    resp, elapsed = run_app(scenario)
+    assert resp.status_code == 500
+    assert resp.json()["detail"] == "Service still loading..."
+    assert 0.2 <= elapsed < 5
+
+
+def test_waiting_requests_are_answered_once_loaded(loading, eager, monkeypatch):
+    monkeypatch.setattr(main, "READY_TIMEOUT_S", 60)
+
+    async def scenario(client):
+        requests = [
+            asyncio.create_task(client.get("/check-get", params={"lat": -26.1, "lon": 28.05})),
+            asyncio.create_task(client.get("/nearest-towers", params={"lat": -26.1, "lon": 28.05})),
+            asyncio.create_task(client.get("/tiles/12/2367/2320.mvt")),
+        ]
+        await asyncio.sleep(0.1)
+        assert not any(r.done() for r in requests)
+        started = time.perf_counter()
+        await asyncio.to_thread(main.load_services)
+        responses = await asyncio.wait_for(asyncio.gather(*requests), 10)
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = run_app(scenario)
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert elapsed < 30   # Woken by the load, not by the 60 s timeout
+    assert main.services_loaded.is_set()
+
+
+@pytest.mark.parametrize("method, path, kwargs, status", [
+    ("post", "/check", {"json": {"latitude": "nan", "longitude": "28"}}, 400),
+    ("post", "/check", {"json": {"latitude": "north", "longitude": "28"}}, 400),
+    ("post", "/check", {"json": {}}, 400),
+    ("get", "/check-get", {"params": {"lat": 91, "lon": 28}}, 400),
+    ("get", "/nearest-towers", {"params": {"lat": -26.1, "lon": 28.05, "k": 0}}, 400),
+    ("get", "/nearest-towers", {"params": {"lat": -26.1, "lon": 28.05, "max_km": "nan"}}, 400),
+    ("get", "/sites/any/check", {"params": {"lat": "inf", "lon": 28}}, 400),
+    ("post", "/check-batch", {"json": {"latitudes": [1.0], "longitudes": []}}, 400),
+    ("get", "/tiles/2/4/0.mvt", {}, 404),
+])
+def test_bad_input_is_rejected_without_waiting(loading, monkeypatch, method, path, kwargs, status):
+    monkeypatch.setattr(main, "READY_TIMEOUT_S", 30)
+
+    async def scenario(client):
+        started = time.perf_counter()
+        resp = await getattr(client, method)(path, **kwargs)
+        return resp, time.perf_counter() - started
+
+    resp, elapsed = run_app(scenario)
+    assert resp.status_code == status
+    assert elapsed < 5
+
+
+def test_waiting_tiles_do_not_hold_pool_threads(loading, eager, monkeypatch):
+    monkeypatch.setattr(main, "READY_TIMEOUT_S", 30)
+
+    async def scenario(client):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 2
+        tiles = [asyncio.create_task(client.get(f"/tiles/12/2367/{2300 + i}.mvt")) for i in range(10)]
+        await asyncio.sleep(0.1)
+        # A plain-def endpoint still gets a pool thread while the tiles wait
+        started = time.perf_counter()
+        reload = await client.post("/admin/reload")
+        waited = time.perf_counter() - started
+        main.checker = eager
+        main.services_loaded.set()
+        main.services_ready.set()
+        return reload, waited, await asyncio.wait_for(asyncio.gather(*tiles), 30)
+
+    reload, waited, tiles = run_app(scenario)
+    assert reload.status_code == 403
+    assert waited < 5
+    assert [t.status_code for t in tiles] == [200] * 10
@@ -0,0 +1,64 @@
+import pytest
+
+import main
+from conftest import KMZ
+
+
+@pytest.fixture
+def reloadable(eager, snapshot_path, monkeypatch):
+    """Reloads read the bundled KMZ and the session snapshot; the active checker is restored afterwards."""
+    monkeypatch.setattr(main, "KMZ_FILE", KMZ)
+    monkeypatch.setattr(main, "SNAPSHOT_FILE", snapshot_path)
+    monkeypatch.setattr(main, "checker", eager)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+
+
+def test_reload_swaps_the_checker(reloadable, eager):
+    assert main.reload_checker() == eager.version
+    assert main.checker is not eager
+    assert main.checker.version == eager.version
+    assert main.load_progress["phase"] == "ready"
+
+
+def test_failed_reload_keeps_the_old_checker(reloadable, eager, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "KMZ_FILE", str(tmp_path / "missing.kmz"))
+    with pytest.raises(FileNotFoundError):
+        main.reload_checker()
+    assert main.checker is eager
+    assert main.load_progress["phase"] == "failed"
+
+
+def test_reload_in_progress_is_skipped(reloadable):
+    with main.reload_lock:
+        assert main.reload_checker(blocking=False) is None
+
+
+def test_admin_reload(reloadable, client, eager):
+    resp = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "reloaded", "dataset_version": eager.version}
+    assert main.checker is not eager
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_admin_reload_needs_the_token(reloadable, client, eager, headers):
+    assert client.post("/admin/reload", headers=headers).status_code == 403
+    assert main.checker is eager
+
+
+def test_admin_reload_disabled_without_a_token(reloadable, client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post("/admin/reload", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_admin_reload_conflict(reloadable, client):
+    with main.reload_lock:
+        resp = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 409
+
+
+def test_admin_reload_failure(reloadable, client, eager, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "KMZ_FILE", str(tmp_path / "missing.kmz"))
+    resp = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 500
+    assert main.checker is eager
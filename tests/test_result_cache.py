@@ -0,0 +1,140 @@
+import pytest
+
+import main
+from conftest import KMZ
+
+INVALID = [("nan", "28.0"), ("-26.0", "nan"), ("inf", "28.0"), ("-26.0", "-inf"), ("91", "28.0"), ("-26.0", "180.5")]
+
+
+class Compute:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, lat, lon):
+        self.calls.append((lat, lon))
+        return True, {'lat': lat}
+
+
+def test_quantized_keys_share_an_entry():
+    cache, compute = main.ResultCache(precision_deg=1e-5), Compute()
+    first = cache.get_or_compute("v1", "detail", -26.100001, 28.05, compute)
+    assert cache.get_or_compute("v1", "detail", -26.100002, 28.05, compute) is first
+    cache.get_or_compute("v1", "fast", -26.100001, 28.05, compute)   # Other kind, own entry
+    cache.get_or_compute("v1", "detail", -26.1001, 28.05, compute)
+    assert len(compute.calls) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_activating_a_version_clears_the_cache():
+    cache, compute = main.ResultCache(), Compute()
+    cache.get_or_compute("old", "detail", 1.0, 2.0, compute)
+    cache.activate("new")
+    assert cache.stats()["entries"] == 0
+    cache.get_or_compute("new", "detail", 1.0, 2.0, compute)
+    assert len(compute.calls) == 2
+
+
+def test_stale_versions_are_not_cached():
+    cache, compute = main.ResultCache(), Compute()
+    cache.activate("new")
+    cache.get_or_compute("new", "detail", 1.0, 2.0, compute)
+    # A request still pinned to the replaced checker
+    cache.get_or_compute("old", "detail", 1.0, 2.0, compute)
+    cache.get_or_compute("old", "detail", 3.0, 4.0, compute)
+    assert cache.version == "new"
+    assert cache.stats()["entries"] == 1
+    assert len(compute.calls) == 3
+    cache.get_or_compute("new", "detail", 1.0, 2.0, compute)
+    assert len(compute.calls) == 3
+
+
+def test_first_version_is_adopted_without_activate():
+    cache, compute = main.ResultCache(), Compute()
+    cache.get_or_compute("new", "detail", 1.0, 2.0, compute)
+    cache.get_or_compute("old", "detail", 1.0, 2.0, compute)
+    assert cache.version == "new"
+
+
+@pytest.mark.parametrize("max_size, entries", [(2, 2), (0, 0)])
+def test_size_bound(max_size, entries):
+    cache, compute = main.ResultCache(max_size=max_size), Compute()
+    for lat in (1.0, 2.0, 3.0):
+        cache.get_or_compute("v1", "detail", lat, 0.0, compute)
+    assert cache.stats()["entries"] == entries
+
+
+def test_reload_activates_the_new_version(eager, snapshot_path, monkeypatch):
+    monkeypatch.setattr(main, "KMZ_FILE", KMZ)
+    monkeypatch.setattr(main, "SNAPSHOT_FILE", snapshot_path)
+    monkeypatch.setattr(main, "checker", eager)
+    monkeypatch.setattr(main, "result_cache", main.ResultCache())
+    main.result_cache.get_or_compute("older", "detail", 1.0, 2.0, Compute())
+    main.reload_checker()
+    assert main.result_cache.version == eager.version
+    assert main.result_cache.stats()["entries"] == 0
+
+
+def matches(match_type):
+    return main.REGISTRY.get_sample_value("coverage_matches_total", {"match_type": match_type}) or 0.0
+
+
+def test_cached_answers_are_counted(client, eager, monkeypatch):
+    monkeypatch.setattr(main, "result_cache", main.ResultCache())
+    lon, lat = eager.tower_lonlat[2]
+    ok, details = eager.check_point(float(lat), float(lon))
+    before = matches(details['match_type'])
+    for _ in range(5):
+        assert client.get("/check-get", params={"lat": float(lat), "lon": float(lon)}).json()["in_coverage"] is ok
+    assert matches(details['match_type']) - before == 5
+    assert (main.result_cache.hits, main.result_cache.misses) == (4, 1)
+
+
+def test_fast_and_batch_answers_are_counted(client, eager, monkeypatch):
+    monkeypatch.setattr(main, "result_cache", main.ResultCache())
+    lon, lat = eager.tower_lonlat[3]
+    label = main.match_type(eager.check_point_fast(float(lat), float(lon))[1])
+    before, before_none = matches(label), matches('none')
+    client.get("/check-get", params={"lat": float(lat), "lon": float(lon), "details": "false"})
+    client.post("/check-batch", json={"latitudes": [float(lat), 0.0], "longitudes": [float(lon), 0.0], "details": False})
+    assert matches(label) - before == 2
+    assert matches('none') - before_none == 1
+
+
+def test_match_type_of_fast_details():
+    assert main.match_type(None) == 'none'
+    assert main.match_type({'tier': 'good'}) == 'Inside Polygon Coverage'
+    assert main.match_type({'tier': main.TOWER_RADIUS_TIER}) == 'Tower Proximity'
+    assert main.match_type({'match_type': 'Tower Proximity', 'tier': ''}) == 'Tower Proximity'
+
+
+def test_check_get(client, eager, covered_point):
+    lat, lon = covered_point
+    resp = client.get("/check-get", params={"lat": lat, "lon": lon})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["in_coverage"] is True
+    assert body["dataset_version"] == eager.version
+
+
+def test_check_unwraps_json_in_a_string(client, covered_point):
+    lat, lon = covered_point
+    payload = f'{{"latitude": {lat}, "longitude": {lon}}}'
+    resp = client.post("/check", json={"latitude": payload, "longitude": ""})
+    assert resp.status_code == 200
+    assert (resp.json()["latitude"], resp.json()["in_coverage"]) == (lat, True)
+
+
+@pytest.mark.parametrize("lat, lon", INVALID)
+def test_invalid_coords_are_rejected(client, lat, lon):
+    for path in ("/check-get", "/sites/anything/check"):
+        resp = client.get(path, params={"lat": lat, "lon": lon})
+        assert resp.status_code == 400, path
+        assert resp.json()["detail"] == main.INVALID_COORDS_DETAIL
+    resp = client.post("/check", json={"latitude": lat, "longitude": lon})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == main.INVALID_COORDS_DETAIL
+
+
+def test_non_numeric_coords_are_rejected(client):
+    assert client.post("/check", json={"latitude": "north", "longitude": "28"}).status_code == 400
+    assert client.post("/check", json={}).status_code == 400
@@ -0,0 +1,93 @@
+import pytest
+
+import main
+from conftest import write_kmz
+
+
+def site_folder(site, lon, lat):
+    ring = " ".join(f"{x},{y}" for x, y in [
+        (lon - 0.01, lat - 0.01), (lon + 0.01, lat - 0.01), (lon + 0.01, lat + 0.01), (lon - 0.01, lat + 0.01), (lon - 0.01, lat - 0.01)
+    ])
+    return f"""<Folder><name>{site}</name>
+<Placemark><name>{site} - Tower</name><Point><coordinates>{lon},{lat}</coordinates></Point></Placemark>
+<Placemark><name>{site} - Good</name><styleUrl>#good</styleUrl>
+<Polygon><outerBoundaryIs><LinearRing><coordinates>{ring}</coordinates></LinearRing></outerBoundaryIs></Polygon></Placemark>
+</Folder>"""
+
+
+# "Site A" is named in two Areas; "Site B" only in one
+SITES_KML = f"""<kml xmlns="http://www.opengis.net/kml/2.2"><Document>
+<Folder><name>Area 01</name>{site_folder("Site A", 28.05, -26.05)}</Folder>
+<Folder><name>Area 02</name>{site_folder("Site A", 28.55, -26.55)}{site_folder("Site B", 28.75, -26.75)}</Folder>
+</Document></kml>"""
+
+LEGEND_KML = b"""<kml xmlns="http://www.opengis.net/kml/2.2"><Document>
+<Folder><name>Legend</name><Placemark><name>Good (50-600 m)</name><styleUrl>#good</styleUrl>
+<Polygon><outerBoundaryIs><LinearRing><coordinates>28,-26 28.1,-26 28.1,-26.1 28,-26</coordinates></LinearRing></outerBoundaryIs></Polygon>
+</Placemark></Folder>
+<Folder><name>Area 01</name><Folder><name>Site A</name><Placemark><name>Site A - Tower</name>
+<Point><coordinates>28.05,-26.05</coordinates></Point></Placemark></Folder></Folder>
+</Document></kml>"""
+
+
+@pytest.fixture
+def sites_client(client, monkeypatch, tmp_path):
+    checker = main.CoverageChecker(write_kmz(tmp_path / "sites.kmz", SITES_KML))
+    monkeypatch.setattr(main, "checker", checker)
+    return client
+
+
+def site_check(client, site, lat, lon, **params):
+    return client.get(f"/sites/{site}/check", params={"lat": lat, "lon": lon, **params})
+
+
+def test_site_check(client, eager):
+    # A site with rings, probed inside its first ring
+    offsets = eager.site_polygon_offsets
+    site, tower = next(
+        (s, t) for s, by_area in eager.site_towers.items() for t in by_area.values() if offsets[t + 1] > offsets[t]
+    )
+    point = eager.polygons.geometry.iloc[eager.site_polygon_items[offsets[tower]]].representative_point()
+    resp = site_check(client, site, point.y, point.x)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["in_coverage"] is True
+    assert body["details"]["site"] == site
+
+
+def test_unknown_site_is_404(client, covered_point):
+    assert site_check(client, "no-such-site", *covered_point).status_code == 404
+
+
+def test_site_names_are_indexed_per_area(sites_client):
+    assert {site: sorted(by_area) for site, by_area in main.checker.site_towers.items()} == {
+        "Site A": ["Area 01", "Area 02"], "Site B": ["Area 02"]
+    }
+
+
+def test_ambiguous_site_is_409(sites_client):
+    resp = site_check(sites_client, "Site A", -26.55, 28.55)
+    assert resp.status_code == 409
+    assert "Area 01, Area 02" in resp.json()["detail"]
+
+
+@pytest.mark.parametrize("area, lat, lon", [("Area 01", -26.05, 28.05), ("Area 02", -26.55, 28.55)])
+def test_area_picks_the_site(sites_client, area, lat, lon):
+    body = site_check(sites_client, "Site A", lat, lon, area=area).json()
+    assert body["in_coverage"] is True
+    assert (body["details"]["area"], body["details"]["site"]) == (area, "Site A")
+    # The same point is not covered by the namesake in the other Area
+    other = "Area 02" if area == "Area 01" else "Area 01"
+    assert site_check(sites_client, "Site A", lat, lon, area=other).json()["in_coverage"] is False
+
+
+def test_unique_site_needs_no_area(sites_client):
+    assert site_check(sites_client, "Site B", -26.75, 28.75).json()["details"]["area"] == "Area 02"
+    assert site_check(sites_client, "Site B", -26.75, 28.75, area="Area 02").status_code == 200
+    assert site_check(sites_client, "Site B", -26.75, 28.75, area="Area 01").status_code == 404
+
+
+def test_legend_placemarks_are_not_coverage():
+    features, placemarks = main.parse_kml_chunk(LEGEND_KML)
+    assert placemarks == 2
+    assert [f['name'] for f in features] == ["Site A - Tower"]
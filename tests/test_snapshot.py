@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import main
+from conftest import KMZ, assert_same_checker
+
+
+def test_snapshot_checker_agrees(from_snapshot, eager, points, expected):
+    assert_same_checker(from_snapshot, eager, points, expected)
+
+
+def test_snapshot_load_skips_the_parse(eager, snapshot_path, monkeypatch):
+    def no_parse(self, kmz_path):
+        raise AssertionError("KMZ parsed despite a current snapshot")
+
+    monkeypatch.setattr(main.CoverageChecker, "load_kmz_manually", no_parse)
+    assert len(main.CoverageChecker(KMZ, snapshot_path=snapshot_path).gdf) == len(eager.gdf)
+
+
+def write_stale_snapshot(source, path, **changes):
+    with np.load(source, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files}
+    arrays.update({k: np.array(v) for k, v in changes.items()})
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+@pytest.mark.parametrize("cls", [main.CoverageChecker, main.LazyCoverageChecker])
+@pytest.mark.parametrize("snapshot, message", [
+    ({"kmz_sha256": "0" * 64}, "stale"),
+    ({"version": main.SNAPSHOT_VERSION - 1}, "stale"),
+    (b"not an npz file", "unreadable"),
+])
+def test_bad_snapshot_falls_back_to_the_kmz(cls, snapshot, message, eager, snapshot_path, tmp_path, capsys):
+    path = str(tmp_path / "towers.kmz.snapshot.npz")
+    if isinstance(snapshot, bytes):
+        (tmp_path / "towers.kmz.snapshot.npz").write_bytes(snapshot)
+    else:
+        write_stale_snapshot(snapshot_path, path, **snapshot)
+
+    checker = cls(KMZ, path)
+    assert message in capsys.readouterr().out
+    assert len(checker.polygon_payloads) == len(eager.polygon_payloads)
+    assert len(checker.tower_payloads) == len(eager.tower_payloads)
+
+    # The parse rewrote the snapshot, so the next load uses it
+    with np.load(path, allow_pickle=False) as data:
+        assert int(data['version']) == main.SNAPSHOT_VERSION
+        assert str(data['kmz_sha256']) == eager.kmz_sha256
@@ -0,0 +1,118 @@
+import math
+
+import mapbox_vector_tile
+import pytest
+
+import main
+
+
+def tile_xy(lat, lon, z):
+    n = 1 << z
+    return int((lon + 180) / 360 * n), int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+
+
+class Render:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return b"tile %d" % self.calls
+
+
+@pytest.fixture(params=["mapped", "lazy"])
+def other(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.fixture
+def tile_cache(monkeypatch):
+    cache = main.TileCache()
+    monkeypatch.setattr(main, "tile_cache", cache)
+    return cache
+
+
+def test_tile_bounds():
+    half = math.pi * main.WEB_MERCATOR_RADIUS_M
+    assert main.tile_bounds(0, 0, 0) == pytest.approx((-half, -half, half, half))
+    # z1: x grows east, y grows south
+    assert main.tile_bounds(1, 1, 0) == pytest.approx((0, 0, half, half))
+    assert main.tile_bounds(1, 0, 1) == pytest.approx((-half, -half, 0, 0))
+
+
+def test_towers_in_bbox_agree(eager, other):
+    lon, lat = eager.tower_lonlat[:, 0], eager.tower_lonlat[:, 1]
+    minx, miny, maxx, maxy = lon.min(), lat.min(), lon.mean(), lat.mean()
+    expected = [i for i, (x, y) in enumerate(eager.tower_lonlat) if minx <= x <= maxx and miny <= y <= maxy]
+    assert list(other.towers_in_bbox(minx, miny, maxx, maxy)) == expected
+
+
+def test_polygons_in_bbox_agree(eager, other, covered_point):
+    lat, lon = covered_point
+    ids, geoms = eager.polygons_in_bbox(lon - 0.05, lat - 0.05, lon + 0.05, lat + 0.05)
+    other_ids, _ = other.polygons_in_bbox(lon - 0.05, lat - 0.05, lon + 0.05, lat + 0.05)
+    assert len(ids) and sorted(other_ids) == sorted(ids)
+
+
+def test_rendered_layers(eager, covered_point):
+    z = 12
+    x, y = tile_xy(*covered_point, z)
+    layers = mapbox_vector_tile.decode(main.render_tile(eager, z, x, y))
+    assert layers["coverage"]["features"] and layers["towers"]["features"]
+    tower_names = {f["properties"]["name"] for f in layers["towers"]["features"]}
+    assert eager.tower_payloads.get(0)["name"] in tower_names
+    assert set(layers["coverage"]["features"][0]["properties"]) <= set(main.TILE_PROPERTIES)
+
+
+def test_empty_tile(eager):
+    x, y = tile_xy(0.0, 0.0, 12)
+    layers = mapbox_vector_tile.decode(main.render_tile(eager, 12, x, y))
+    assert not any(layer["features"] for layer in layers.values())
+
+
+def test_tile(client, eager, covered_point, tile_cache):
+    x, y = tile_xy(*covered_point, 12)
+    resp = client.get(f"/tiles/12/{x}/{y}.mvt")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert resp.headers["x-dataset-version"] == eager.version
+    assert resp.content
+    assert client.get(f"/tiles/12/{x}/{y}.mvt").content == resp.content
+    assert (tile_cache.hits, tile_cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("path", [
+    "/tiles/3/8/0.mvt", "/tiles/3/0/8.mvt", "/tiles/3/-1/0.mvt", f"/tiles/{main.MAX_TILE_ZOOM + 1}/0/0.mvt"
+])
+def test_tile_out_of_range_is_404(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_tile_cache_hits_and_evicts():
+    cache, render = main.TileCache(max_size=2), Render()
+    assert cache.get_or_render("v1", (1, 0, 0), render) == cache.get_or_render("v1", (1, 0, 0), render)
+    cache.get_or_render("v1", (1, 1, 0), render)
+    cache.get_or_render("v1", (1, 0, 1), render)   # Evicts (1, 0, 0)
+    assert list(cache.entries) == [(1, 1, 0), (1, 0, 1)]
+    assert (cache.hits, cache.misses, render.calls) == (1, 3, 3)
+
+
+def test_activating_a_version_clears_the_cache():
+    cache, render = main.TileCache(), Render()
+    cache.get_or_render("old", (1, 0, 0), render)
+    cache.activate("new")
+    assert cache.stats()["entries"] == 0
+    cache.get_or_render("new", (1, 0, 0), render)
+    assert render.calls == 2
+
+
+def test_stale_versions_are_not_cached():
+    cache, render = main.TileCache(), Render()
+    cache.activate("new")
+    tile = cache.get_or_render("new", (1, 0, 0), render)
+    # A request pinned to the replaced checker renders its own tile ...
+    assert cache.get_or_render("old", (1, 0, 0), render) == b"tile 2"
+    # ... without wiping or replacing the new version's tiles
+    assert cache.version == "new"
+    assert cache.get_or_render("new", (1, 0, 0), render) is tile
+    assert render.calls == 2